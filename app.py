@@ -1,6 +1,9 @@
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+from flask_caching import Cache
+import httpx
 import logging
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from openproject_client import OpenProjectClient
 from gantt_chart_generator import GanttChartGenerator
@@ -14,6 +17,24 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# Rendered charts are reused for a minute. This stacks on the client's own cache
+# (60s for work packages, 300s for projects), so a chart can show work packages
+# up to two minutes old and a project name up to six minutes old.
+GANTT_CACHE_TIMEOUT = 60
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': GANTT_CACHE_TIMEOUT})
+
+def is_successful(rv):
+    # Failed charts are not cached, so a brief OpenProject outage isn't served for the whole TTL
+    status = rv[1] if isinstance(rv, tuple) else rv.status_code
+    return status == 200
+
+@lru_cache(maxsize=None)
+def plotly_js_url():
+    # The browser bundle must match the plotly.js the installed plotly builds figures for.
+    # plotly.offline is imported on first use; it doesn't pull in pandas or plotly.io.
+    from plotly.offline import get_plotlyjs_version
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
 OPENPROJECT_URL = os.getenv('OPENPROJECT_URL')
 OPENPROJECT_API_KEY = os.getenv('OPENPROJECT_API_KEY')
 
@@ -24,16 +45,12 @@ if not OPENPROJECT_URL or not OPENPROJECT_API_KEY:
 op_client = OpenProjectClient(OPENPROJECT_URL, OPENPROJECT_API_KEY)
 gantt_generator = GanttChartGenerator(op_client)
 
-# Load HTML template from file
-with open('templates/main_template.html') as f:
-    HTML_TEMPLATE = f.read()
-
 @app.route('/')
 def index():
     try:
         projects = op_client.get_projects()
         logger.info(f"Successfully retrieved {len(projects)} projects")
-        return render_template_string(HTML_TEMPLATE, projects=projects, error=None)
+        return render_template('main_template.html', projects=projects, error=None, plotly_js_url=plotly_js_url())
     except Exception as e:
         logger.error(f"Error fetching projects: {e}")
         error_msg = str(e)
@@ -41,18 +58,27 @@ def index():
             error_msg = "Authentication failed. Please check your OPENPROJECT_API_KEY environment variable."
         elif "403" in error_msg:
             error_msg = "Access forbidden. Your API key doesn't have sufficient permissions to view projects."
-        elif "Connection" in error_msg:
+        elif "Connection" in error_msg or isinstance(e, httpx.ConnectError):
             error_msg = f"Cannot connect to OpenProject at {OPENPROJECT_URL}. Please check your OPENPROJECT_URL environment variable."
-        return render_template_string(HTML_TEMPLATE, projects=[], error=error_msg)
+        return render_template('main_template.html', projects=[], error=error_msg, plotly_js_url=plotly_js_url())
 
 @app.route('/gantt/<int:project_id>')
+@cache.cached(timeout=GANTT_CACHE_TIMEOUT, response_filter=is_successful)
 def gantt_chart(project_id: int):
     return gantt_generator.generate_gantt_chart(project_id)
 
 @app.route('/gantt_epic/<int:project_id>')
+@cache.cached(timeout=GANTT_CACHE_TIMEOUT, response_filter=is_successful)
 def gantt_chart_epic(project_id: int):
     return gantt_generator.generate_gantt_chart(project_id, epic_only=True)
 
+@app.route('/gantt_data/<int:project_id>')
+@cache.cached(timeout=GANTT_CACHE_TIMEOUT, query_string=True, response_filter=is_successful)
+def gantt_data(project_id: int):
+    epic_only = request.args.get('epic_only') == '1'
+    body, status = gantt_generator.generate_gantt_json(project_id, epic_only=epic_only)
+    return Response(body, status=status, mimetype='application/json')
+
 # ...existing code for other routes...
 
 if __name__ == '__main__':
@@ -1,94 +1,128 @@
 import logging
-import pandas as pd
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
+import textwrap
+
+# numpy, pandas and plotly are imported inside the methods that use them, so
+# pages that never build a chart (e.g. the project list) don't pay their import cost.
 
 class GanttChartGenerator:
     """Generate Gantt charts from OpenProject data"""
+    # Above this many bars the chart is drawn with WebGL instead of SVG
+    WEBGL_THRESHOLD = 500
+    CLOSED_STATUSES = frozenset({'Closed', 'closed', 'CLOSED'})
+    # Closed, not started, in progress, overdue, undated
+    STATUS_COLORS = ('#27ae60', '#9b59b6', '#3498db', '#e74c3c', '#95a5a6')
+    # Low-cardinality text columns, stored as pandas categoricals
+    CATEGORICAL_COLUMNS = ['Status', 'Type', 'Assignee', 'Color']
+    PLOT_CONFIG = {
+        'displayModeBar': True,
+        'responsive': True,
+        'displaylogo': False,
+        'modeBarButtonsToRemove': ['lasso2d', 'select2d']
+    }
+    HOVER_COLUMNS = ['Duration', 'Progress', 'Assignee', 'Type', 'Start', 'Finish', 'Status']
+
     def __init__(self, openproject_client):
         self.client = openproject_client
 
-    def _parse_date(self, date_str):
-        if not date_str:
-            return None
-        try:
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            return None
+    def _parse_dates(self, dates):
+        import pandas as pd
+        return pd.to_datetime(dates, errors='coerce', utc=True, format='ISO8601')
 
     def _get_status_color(self, status, start, finish, now, closed_statuses=None):
+        import numpy as np
         if closed_statuses is None:
-            closed_statuses = {'Closed', 'closed', 'CLOSED'}
-        if status in closed_statuses:
-            return '#27ae60'
-        if start and now and start > now:
-            return '#9b59b6'
-        if start and finish and now and start <= now <= finish:
-            return '#3498db'
-        if finish and now and finish < now:
-            return '#e74c3c'
-        return '#95a5a6'
+            closed_statuses = self.CLOSED_STATUSES
+        # Plain datetime64 arrays: comparisons with NaT are False, as for missing dates
+        start = start.to_numpy(dtype='datetime64[ns]')
+        finish = finish.to_numpy(dtype='datetime64[ns]')
+        now = now.to_datetime64()
+        conditions = [
+            status.isin(closed_statuses).to_numpy(),
+            start > now,
+            (start <= now) & (finish >= now),
+            finish < now,
+        ]
+        return np.take(self.STATUS_COLORS, np.select(conditions, [0, 1, 2, 3], default=4))
 
     def _extract_work_package_data(self, work_packages):
-        data = []
-        now = datetime.utcnow()
+        import pandas as pd
+        now = pd.Timestamp.now(tz='UTC')
         def wrap_name(name, max_chars=100, max_lines=2):
             if len(name) <= max_chars:
                 return name
-            words = name.split()
-            lines = []
-            current_line = ''
-            for word in words:
-                if len(current_line) + len(word) + 1 <= max_chars:
-                    if current_line:
-                        current_line += ' '
-                    current_line += word
-                else:
-                    lines.append(current_line)
-                    current_line = word
-                    if len(lines) == max_lines - 1:
-                        break
-            if current_line:
-                lines.append(current_line)
+            lines = textwrap.wrap(name, max_chars)
+            result = '<br>'.join(lines[:max_lines])
             if len(lines) > max_lines:
-                lines = lines[:max_lines]
-            result = '<br>'.join(lines)
-            if len(lines) == max_lines and (len(current_line) + sum(len(l) for l in lines[:-1])) < len(name):
                 result += '...'
             return result
 
-        for wp in work_packages:
-            wp_id = wp.get('id')
-            subject = wp.get('subject', 'Untitled')
-            wrapped_subject = wrap_name(subject)
-            start_date = self._parse_date(wp.get('startDate') or wp.get('derivedStartDate'))
-            due_date = self._parse_date(wp.get('dueDate') or wp.get('derivedDueDate'))
-            if start_date and not due_date:
-                due_date = start_date + timedelta(days=1)
-            elif due_date and not start_date:
-                start_date = due_date - timedelta(days=1)
-            status = wp.get('_links', {}).get('status', {}).get('title', 'Unknown')
-            progress = wp.get('percentageDone', 0) / 100.0 if wp.get('percentageDone') is not None else 0
-            assignee = wp.get('_links', {}).get('assignee', {}).get('title', 'Unassigned')
-            type_name = wp.get('_links', {}).get('type', {}).get('title', 'Task')
-            color = self._get_status_color(status, start_date, due_date, now)
-            missing_start = start_date is None
-            data.append({
-                'id': wp_id,
-                'Task': f"#{wp_id}: {wrapped_subject}",
-                'Start': start_date,
-                'Finish': due_date,
-                'Status': status,
-                'Progress': progress,
-                'Assignee': assignee,
-                'Type': type_name,
-                'Color': color,
-                'Duration': (due_date - start_date).days if start_date and due_date else 0,
-                'MissingStart': missing_start
+        # Build each column straight from the work packages, touching only the fields we use
+        links = [wp.get('_links', {}) for wp in work_packages]
+        def column(name):
+            return pd.Series([wp.get(name) for wp in work_packages], dtype=object)
+        def link_title(name):
+            return pd.Series([link.get(name, {}).get('title') for link in links], dtype=object)
+
+        start_date = self._parse_dates(column('startDate').fillna(column('derivedStartDate')))
+        due_date = self._parse_dates(column('dueDate').fillna(column('derivedDueDate')))
+        # Tasks with a single date are shown as one-day tasks
+        due_date = due_date.fillna(start_date + pd.Timedelta(days=1))
+        start_date = start_date.fillna(due_date - pd.Timedelta(days=1))
+        status = link_title('status').fillna('Unknown')
+        subject = column('subject').fillna('Untitled')
+        return pd.DataFrame({
+            'id': pd.to_numeric(column('id')),
+            'Task': '#' + column('id').astype(str) + ': ' + subject.map(wrap_name),
+            'Start': start_date,
+            'Finish': due_date,
+            'Status': status,
+            'Progress': pd.to_numeric(column('percentageDone'), errors='coerce').fillna(0) / 100.0,
+            'Assignee': link_title('assignee').fillna('Unassigned'),
+            'Type': link_title('type').fillna('Task'),
+            'Color': self._get_status_color(status, start_date, due_date, now),
+            'Duration': (due_date - start_date).dt.days.fillna(0).astype('int32'),
+            'MissingStart': start_date.isna()
+        }).astype({name: 'category' for name in self.CATEGORICAL_COLUMNS})
+
+    def _webgl_traces(self, df_plot):
+        import numpy as np
+        # Each task is a thick line segment [start, finish, gap]; one trace per color
+        hovertemplate = (
+            "<b>%{y}</b><br>"
+            "Start: %{customdata[4]|%Y-%m-%d} (Week %{customdata[7]})<br>"
+            "End: %{customdata[5]|%Y-%m-%d} (Week %{customdata[8]})<br>"
+            "Status: %{customdata[6]}<br>"
+            "Duration: %{customdata[0]} days<br>"
+            "Progress: %{customdata[1]:.0%}<br>"
+            "Assignee: %{customdata[2]}<br>"
+            "Type: %{customdata[3]}<br>"
+            "<extra></extra>"
+        )
+        traces = []
+        for color, group in df_plot.groupby('Color', sort=False, observed=True):
+            gap = np.full(len(group), None, dtype=object)
+            x = np.column_stack([group['StartWeek'].to_numpy(dtype=object), group['FinishWeek'].to_numpy(dtype=object), gap]).ravel()
+            y = np.column_stack([group['Task'].to_numpy(dtype=object), group['Task'].to_numpy(dtype=object), gap]).ravel()
+            customdata = np.repeat(group[self.HOVER_COLUMNS + ['StartWeek', 'FinishWeek']].to_numpy(), 3, axis=0)
+            traces.append({
+                'type': 'scattergl',
+                'x': x,
+                'y': y,
+                'mode': 'lines',
+                'line': {'color': color, 'width': 12},
+                'customdata': customdata,
+                'hovertemplate': hovertemplate
             })
-        return pd.DataFrame(data)
+        return traces
 
-    def generate_gantt_chart(self, project_id, epic_only=False):
+    def build_gantt_figure(self, project_id, epic_only=False):
+        """Build the chart for a project as a plain dict.
+
+        Returns 'data', 'layout', 'config' and 'summary' keys, or a 'message'
+        key holding an HTML alert when there is nothing to plot. Failures also
+        carry 'status': 500 so callers don't treat (or cache) them as charts.
+        """
+        import plotly.io as pio
         try:
             # Get project information
             project = self.client.get_project(project_id)
@@ -99,18 +133,20 @@ class GanttChartGenerator:
             logging.info(f"Found {len(work_packages)} work packages for project {project_id}")
 
             if not work_packages:
-                return f"<div class='alert alert-info'><h4>No Work Packages Found</h4><p>Project '{project_name}' has no work packages to display in the Gantt chart.</p></div>"
+                return {'message': f"<div class='alert alert-info'><h4>No Work Packages Found</h4><p>Project '{project_name}' has no work packages to display in the Gantt chart.</p></div>"}
 
             # Convert to DataFrame
             df = self._extract_work_package_data(work_packages)
             logging.info(f"Processed {len(df)} work packages with dates")
 
             if epic_only:
-                df = df[df['Type'].str.lower() == 'epic']
+                # Compare the few distinct type names instead of every row's string
+                types = df['Type'].cat.categories
+                df = df[df['Type'].isin(types[types.str.lower() == 'epic'])]
                 logging.info(f"Filtered to {len(df)} EPIC work packages")
 
             if df.empty:
-                return f"<div class='alert alert-warning'><h4>No Scheduled Tasks</h4><p>Project '{project_name}' has work packages, but none have start or due dates set.</p><p>Please set dates for work packages to display them in the Gantt chart.</p></div>"
+                return {'message': f"<div class='alert alert-warning'><h4>No Scheduled Tasks</h4><p>Project '{project_name}' has work packages, but none have start or due dates set.</p><p>Please set dates for work packages to display them in the Gantt chart.</p></div>"}
             # Sort by start date, but put tasks with missing start at the end
             if 'MissingStart' in df.columns:
                 df = df.sort_values(['MissingStart', 'Start'], ascending=[True, True])
@@ -122,13 +158,10 @@ class GanttChartGenerator:
                 valid_starts = df['Start'].dropna()
                 if not valid_starts.empty:
                     min_start = valid_starts.min()
-                    def week_or_none(date):
-                        if pd.notnull(date):
-                            w = ((date - min_start).days // 7 + 1)
-                            return w if w >= 1 else 1
-                        return None
-                    df['StartWeek'] = df['Start'].apply(week_or_none)
-                    df['FinishWeek'] = df['Finish'].apply(week_or_none)
+                    def weeks(dates):
+                        return ((dates - min_start).dt.days // 7 + 1).clip(lower=1).astype('Int64')
+                    df['StartWeek'] = weeks(df['Start'])
+                    df['FinishWeek'] = weeks(df['Finish'])
                     df.loc[df['FinishWeek'] == df['StartWeek'], 'FinishWeek'] = df['StartWeek'] + 1
                 else:
                     df['StartWeek'] = None
@@ -137,11 +170,10 @@ class GanttChartGenerator:
             df_plot = df[df['StartWeek'].notnull() & df['FinishWeek'].notnull()].copy()
             if df_plot.empty:
                 logging.warning("No tasks with valid week values to plot.")
-                return f"<div class='alert alert-warning'><h4>No Scheduled Tasks</h4><p>Project '{project_name}' has work packages, but none have start or due dates set.</p><p>Please set dates for work packages to display them in the Gantt chart.</p></div>"
+                return {'message': f"<div class='alert alert-warning'><h4>No Scheduled Tasks</h4><p>Project '{project_name}' has work packages, but none have start or due dates set.</p><p>Please set dates for work packages to display them in the Gantt chart.</p></div>"}
 
             logging.info("Gantt DataFrame after week calculation:\n" + df_plot[['Task','Start','Finish','StartWeek','FinishWeek','Color']].to_string())
 
-            fig = go.Figure()
             hovertemplate = (
                 "<b>%{y}</b><br>"
                 "Start: %{customdata[4]|%Y-%m-%d} (Week %{base})<br>"
@@ -153,27 +185,31 @@ class GanttChartGenerator:
                 "Type: %{customdata[3]}<br>"
                 "<extra></extra>"
             )
-            for idx, row in df_plot.iterrows():
-                fig.add_trace(go.Bar(
-                    x=[row['FinishWeek'] - row['StartWeek']],
-                    y=[row['Task']],
-                    base=row['StartWeek'],
-                    orientation='h',
-                    marker=dict(color=row['Color']),
-                    customdata=[[row['Duration'], row['Progress'], row['Assignee'], row['Type'], row['Start'], row['Finish'], row['Status']]],
-                    hovertemplate=hovertemplate,
-                    name=row['Task'],
-                    showlegend=False
-                ))
+            # The figure is built as plain dicts: plotly's graph_objects would run
+            # its property validators over every array we pass in.
+            if len(df_plot) > self.WEBGL_THRESHOLD:
+                traces = self._webgl_traces(df_plot)
+            else:
+                # One trace for all tasks: per-task values are passed as arrays
+                traces = [{
+                    'type': 'bar',
+                    'x': (df_plot['FinishWeek'] - df_plot['StartWeek']).tolist(),
+                    'y': df_plot['Task'].tolist(),
+                    'base': df_plot['StartWeek'].tolist(),
+                    'orientation': 'h',
+                    'marker': {'color': df_plot['Color'].tolist()},
+                    'customdata': df_plot[self.HOVER_COLUMNS].to_numpy(),
+                    'hovertemplate': hovertemplate
+                }]
 
             missing_start_df = df[df['MissingStart'] == True]
-            y_labels = df_plot['Task'].tolist()[::-1]
-            for i, (_, row) in enumerate(missing_start_df.iterrows()):
-                y_labels.insert(0, row['Task'])
-                fig.add_annotation(
+            missing_tasks = missing_start_df['Task'].tolist()
+            y_labels = missing_tasks[::-1] + df_plot['Task'].tolist()[::-1]
+            annotations = [
+                dict(
                     xref='paper', yref='y',
-                    x=0.5, y=row['Task'],
-                    text=f"{row['Task']} (No start date)",
+                    x=0.5, y=task,
+                    text=f"{task} (No start date)",
                     showarrow=False,
                     font=dict(color='gray', size=12),
                     align='left',
@@ -182,66 +218,95 @@ class GanttChartGenerator:
                     borderwidth=1,
                     opacity=0.8
                 )
+                for task in missing_tasks
+            ]
 
             max_week = int(df_plot['FinishWeek'].max()) if not df_plot.empty and df_plot['FinishWeek'].notnull().any() else 1
             week_ticks = list(range(1, max_week + 2))
-            fig.update_layout(
-                height=max(600, (len(df_plot) + len(missing_start_df)) * 40 + 150),
-                margin=dict(l=20, r=20, t=80, b=50),
-                xaxis_title="Project Week",
-                yaxis_title="Tasks",
-                showlegend=False,
-                xaxis=dict(
-                    tickmode='array',
-                    tickvals=week_ticks,
-                    ticktext=[f"Week {w}" for w in week_ticks],
-                    range=[0.5, max_week + 1.5],
-                    showgrid=True
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    categoryorder='array',
-                    categoryarray=y_labels,
-                ),
-                hovermode='closest',
-                barmode='stack'
-            )
-            html_content = fig.to_html(
-                include_plotlyjs=True,
-                div_id="gantt-chart",
-                config={
-                    'displayModeBar': True,
-                    'responsive': True,
-                    'displaylogo': False,
-                    'modeBarButtonsToRemove': ['lasso2d', 'select2d']
+            layout = {
+                'template': pio.templates[pio.templates.default].to_plotly_json(),
+                'height': max(600, (len(df_plot) + len(missing_start_df)) * 40 + 150),
+                'margin': {'l': 20, 'r': 20, 't': 80, 'b': 50},
+                'showlegend': False,
+                'xaxis': {
+                    'title': {'text': "Project Week"},
+                    'tickmode': 'array',
+                    'tickvals': week_ticks,
+                    'ticktext': [f"Week {w}" for w in week_ticks],
+                    'range': [0.5, max_week + 1.5],
+                    'showgrid': True
+                },
+                'yaxis': {
+                    'title': {'text': "Tasks"},
+                    'showgrid': True,
+                    'categoryorder': 'array',
+                    'categoryarray': y_labels,
+                },
+                'annotations': annotations,
+                'hovermode': 'closest',
+                'barmode': 'stack'
+            }
+            return {
+                'data': traces,
+                'layout': layout,
+                'config': self.PLOT_CONFIG,
+                'summary': {
+                    'tasks': len(df),
+                    'start_week': int(df['StartWeek'].min()),
+                    'finish_week': int(df['FinishWeek'].max()),
+                    'duration_days': (df['Finish'].max() - df['Start'].min()).days
                 }
-            )
-            wrapped_html = f"""
-            <div class="gantt-chart-container">
-                <div class="chart-info mb-3">
-                    <div class="row">
-                        <div class="col-md-4">
-                            <strong>Total Tasks:</strong> {len(df)}
-                        </div>
-                        <div class="col-md-4">
-                            <strong>Week Range:</strong> Week {df['StartWeek'].min()} to Week {df['FinishWeek'].max()}
-                        </div>
-                        <div class="col-md-4">
-                            <strong>Project Duration:</strong> {(df['Finish'].max() - df['Start'].min()).days} days
-                        </div>
-                    </div>
-                </div>
-                {html_content}
-            </div>
-            <style>
-                .gantt-chart-container {{ width: 100%; height: auto; }}
-                .chart-info {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; border-left: 4px solid #007bff; }}
-                #gantt-chart {{ width: 100% !important; height: auto !important; }}
-            </style>
-            """
-            return wrapped_html
+            }
         except Exception as e:
             logging.error(f"Error generating Gantt chart: {e}")
             import traceback
             traceback.print_exc()
-            return f"<div class='alert alert-danger'><h4>Error generating Gantt chart</h4><p><strong>Error:</strong> {str(e)}</p><p>Please check the server logs for more details.</p></div>"
+            return {'message': f"<div class='alert alert-danger'><h4>Error generating Gantt chart</h4><p><strong>Error:</strong> {str(e)}</p><p>Please check the server logs for more details.</p></div>", 'status': 500}
+
+    def generate_gantt_chart(self, project_id, epic_only=False):
+        import plotly.io as pio
+        chart = self.build_gantt_figure(project_id, epic_only)
+        if 'message' in chart:
+            return chart['message'], chart.get('status', 200)
+        # plotly.js is loaded from the CDN so the browser can cache it across charts
+        html_content = pio.to_html(
+            {'data': chart['data'], 'layout': chart['layout']},
+            include_plotlyjs='cdn',
+            include_mathjax=False,
+            full_html=False,
+            validate=False,
+            div_id="gantt-chart",
+            config=chart['config']
+        )
+        summary = chart['summary']
+        wrapped_html = f"""
+        <div class="gantt-chart-container">
+            <div class="chart-info mb-3">
+                <div class="row">
+                    <div class="col-md-4">
+                        <strong>Total Tasks:</strong> {summary['tasks']}
+                    </div>
+                    <div class="col-md-4">
+                        <strong>Week Range:</strong> Week {summary['start_week']} to Week {summary['finish_week']}
+                    </div>
+                    <div class="col-md-4">
+                        <strong>Project Duration:</strong> {summary['duration_days']} days
+                    </div>
+                </div>
+            </div>
+            {html_content}
+        </div>
+        <style>
+            .gantt-chart-container {{ width: 100%; height: auto; }}
+            .chart-info {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; border-left: 4px solid #007bff; }}
+            #gantt-chart {{ width: 100% !important; height: auto !important; }}
+        </style>
+        """
+        return wrapped_html, 200
+
+    def generate_gantt_json(self, project_id, epic_only=False):
+        """Serialize build_gantt_figure's result for rendering with Plotly.react in the browser"""
+        import plotly.io as pio
+        chart = self.build_gantt_figure(project_id, epic_only)
+        status = chart.pop('status', 200)
+        return pio.json.to_json_plotly(chart, engine='orjson'), status
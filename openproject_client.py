@@ -1,74 +1,126 @@
 import base64
-import requests
+import math
+import httpx
+import orjson
 import logging
-from typing import List, Dict, Optional, Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple
 
 class OpenProjectClient:
     """Client for interacting with OpenProject API v3"""
-    def __init__(self, base_url: str, api_key: str):
+    # Seconds a GET response is reused; projects change less often than work packages
+    CACHE_TTL = {'/projects': 300, '/work_packages': 60}
+    DEFAULT_CACHE_TTL = 60
+
+    def __init__(self, base_url: str, api_key: str, cache_size: int = 128):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
-        self.session = requests.Session()
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
         auth_string = f"apikey:{api_key}"
         encoded_auth = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
-        self.session.headers.update({
-            'Authorization': f'Basic {encoded_auth}',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        })
+        # HTTP/2 multiplexes the concurrent page requests over one connection
+        self.session = httpx.Client(
+            http2=True,
+            headers={
+                'Authorization': f'Basic {encoded_auth}',
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            },
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            timeout=30,
+            # requests followed redirects by default (e.g. http -> https); httpx does not
+            follow_redirects=True
+        )
         logging.info(f"Initialized OpenProject client for {self.base_url}")
 
     def _make_request(self, endpoint: str, method: str = 'GET', params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict[str, Any]:
         url = f"{self.base_url}/api/v3{endpoint}"
+        cache_key = None
+        if method == 'GET':
+            cache_key = (url, tuple(sorted((params or {}).items())))
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
         response = self.session.request(method=method, url=url, params=params, json=data)
         response.raise_for_status()
-        return response.json()
+        # orjson parses the raw bytes directly, skipping the str decode
+        result = orjson.loads(response.content)
+        if cache_key is not None:
+            self._cache_set(cache_key, result, self._cache_ttl(endpoint))
+        return result
+
+    def _cache_ttl(self, endpoint: str) -> int:
+        for prefix, ttl in self.CACHE_TTL.items():
+            if endpoint.startswith(prefix):
+                return ttl
+        return self.DEFAULT_CACHE_TTL
+
+    def _cache_get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def _cache_set(self, key: tuple, value: Dict[str, Any], ttl: int) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _get_page(self, endpoint: str, params: Dict) -> Tuple[int, List[Dict[str, Any]]]:
+        data = self._make_request(endpoint, params=params)
+        return data.get('total', 0), data.get('_embedded', {}).get('elements', [])
+
+    def _get_collection(self, endpoint: str, params: Optional[Dict] = None, limit: int = 1000, page_size: int = 100, max_workers: int = 8) -> List[Dict[str, Any]]:
+        # OpenProject's offset is a 1-based page number. The first page tells us
+        # the collection size; the remaining pages are fetched concurrently.
+        def fetch_page(offset: int) -> List[Dict[str, Any]]:
+            return self._get_page(endpoint, dict(params or {}, pageSize=page_size, offset=offset))[1]
+
+        total, first_elements = self._get_page(endpoint, dict(params or {}, pageSize=page_size, offset=1))
+        # Copy so extending it does not modify the cached first page
+        elements = list(first_elements)
+        total = min(total, limit)
+        if not elements or len(elements) >= total:
+            return elements[:limit]
+        page_count = math.ceil(total / page_size)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in executor.map(fetch_page, range(2, page_count + 1)):
+                elements.extend(page)
+        return elements[:limit]
 
     def get_projects(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        all_projects = []
-        offset = 1
-        page_size = 100
-        while True:
-            params = {'pageSize': page_size, 'offset': offset}
-            response = self._make_request('/projects', params=params)
-            elements = response.get('_embedded', {}).get('elements', [])
-            if not elements:
-                break
-            all_projects.extend(elements)
-            total = response.get('total', 0)
-            if len(all_projects) >= total or len(all_projects) >= limit:
-                break
-            offset += page_size
-        return all_projects
+        return self._get_collection('/projects', limit=limit)
 
     def get_project(self, project_id: int) -> Dict[str, Any]:
         return self._make_request(f'/projects/{project_id}')
 
     def get_work_packages(self, project_id: int, limit: int = 1000) -> List[Dict[str, Any]]:
-        all_work_packages = []
-        offset = 1
-        page_size = 100
-        while True:
-            params = {
-                'pageSize': page_size,
-                'offset': offset,
-                'filters': '[{"project_id": {"operator": "=", "values": ["%s"]}}]' % str(project_id)
-            }
-            response = self._make_request('/work_packages', params=params)
-            elements = response.get('_embedded', {}).get('elements', [])
-            if not elements:
-                break
-            all_work_packages.extend(elements)
-            total = response.get('total', 0)
-            if len(all_work_packages) >= total or len(all_work_packages) >= limit:
-                break
-            offset += page_size
-        return all_work_packages
+        params = {
+            'filters': '[{"project_id": {"operator": "=", "values": ["%s"]}}]' % str(project_id)
+        }
+        return self._get_collection('/work_packages', params=params, limit=limit)
 
     def get_work_package_relations(self, work_package_id: int) -> List[Dict[str, Any]]:
         try:
             response = self._make_request(f'/work_packages/{work_package_id}/relations')
             return response.get('_embedded', {}).get('elements', [])
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             logging.warning(f"Could not fetch relations for work package {work_package_id}")
             return []
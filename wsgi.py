@@ -0,0 +1,3 @@
+# WSGI entrypoint for production servers, e.g.:
+#   gunicorn -w $(nproc) -k gthread --threads 8 wsgi:app
+from app import app